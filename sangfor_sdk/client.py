@@ -8,82 +8,209 @@ import datetime
 import hashlib
 import hmac
 import json
+import re
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError: # orjson is optional; fall back to the standard library parser.
+    _loads = json.loads
 
 # Disable SSL warnings for self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Matches canonical VM IDs, so names that merely contain four dashes are not mistaken for one.
+_UUID_RE = re.compile(r'\A[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z', re.I)
+
+# Fresh SHA-256 state; copying it is cheaper than constructing a new hash object.
+_SHA256_TEMPLATE = hashlib.sha256()
+
 # --- Library Helper Functions ---
 def _sign(key, message):
     """Private function to sign a message using HMAC-SHA256."""
-    return hmac.new(key, message.encode('utf-8'), hashlib.sha256).digest()
+    return hmac.digest(key, message.encode('utf-8'), 'sha256')
 
 def _get_signature_key(key, date_stamp, region_name, service_name):
-    """Private function to generate the signature key required for authentication."""
-    k_date = _sign(("AWS4" + key).encode('utf-8'), date_stamp)
+    """
+    Private function to generate the signature key required for authentication.
+    `key` may be the raw secret key (str) or the already encoded "AWS4" + secret key (bytes).
+    """
+    if isinstance(key, str):
+        key = ("AWS4" + key).encode('utf-8')
+    k_date = _sign(key, date_stamp)
     k_region = _sign(k_date, region_name)
     k_service = _sign(k_region, service_name)
     k_signing = _sign(k_service, "aws4_request")
     return k_signing
 
+def _hash_payload(body, chunk_size=65536):
+    """Private function to compute the hex SHA-256 of a request body in fixed-size chunks."""
+    h = _SHA256_TEMPLATE.copy()
+    if not body:
+        return h.hexdigest()
+    if isinstance(body, (bytes, bytearray)):
+        h.update(body)
+    elif isinstance(body, str):
+        for i in range(0, len(body), chunk_size):
+            h.update(body[i:i + chunk_size].encode('utf-8'))
+    elif hasattr(body, 'read') and hasattr(body, 'seek'):
+        start = body.tell()
+        while True:
+            chunk = body.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        body.seek(start) # Rewind so requests can still send the body.
+    else:
+        raise TypeError(f"Cannot sign a request body of type {type(body).__name__}; use bytes, str or a seekable file.")
+    return h.hexdigest()
+
+_EMPTY = {}
+
+def _aggregate_report(report, all_vms):
+    """Private function that adds every VM's resources to the overall and AZ totals of a report."""
+    by_az = report['by_availability_zone']
+    status_positions = {'running': 1, 'stopped': 2}
+    disks_key, size_key = 'disks', 'size_mb'
+    # Running sums per AZ, written back to the report once at the end:
+    # [vms, running, stopped, other, cores, memory_mb, disk_mb, used_mhz, used_mem_mb, used_disk_mb]
+    az_sums = {az_name: [0, 0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0] for az_name in by_az}
+
+    for vm in all_vms:
+        sums = az_sums.get(vm.get('az_name'))
+        if sums is None:
+            continue
+
+        cpu = vm.get('cpu_status') or _EMPTY
+        mem = vm.get('memory_status') or _EMPTY
+        sto = vm.get('storage_status') or _EMPTY
+
+        sums[0] += 1
+        sums[status_positions.get(vm.get('status'), 3)] += 1
+        sums[4] += vm.get('cores', 0)
+        sums[5] += vm.get('memory_mb', 0.0)
+        total_disk_mb = 0.0
+        for disk in vm.get(disks_key) or ():
+            size_mb = disk.get(size_key)
+            if size_mb:
+                total_disk_mb += size_mb
+        sums[6] += total_disk_mb
+        sums[7] += cpu.get('used_mhz', 0.0)
+        sums[8] += mem.get('used_mb', 0.0)
+        sums[9] += sto.get('used_mb', 0.0)
+
+    overall = report['overall_totals']
+    overall_status = overall['vms_by_status']
+    provisioned = overall['total_provisioned']
+    used = overall['total_used']
+    for az_name, (vms, running, stopped, other, cores, memory_mb, disk_mb, used_mhz, used_mem_mb, used_disk_mb) in az_sums.items():
+        # --- Calculate AZ-Specific Totals ---
+        az_report = by_az[az_name]
+        az_report['total_vms'] += vms
+        az_status = az_report['vms_by_status']
+        az_status['running'] += running
+        az_status['stopped'] += stopped
+        az_status['other'] += other
+        az_provisioned = az_report['total_provisioned']
+        az_provisioned['cpu_cores'] += cores
+        az_provisioned['ram_gb'] += memory_mb / 1024
+        az_provisioned['disk_tb'] += disk_mb / (1024 * 1024)
+        az_used = az_report['total_used']
+        az_used['cpu_mhz'] += used_mhz
+        az_used['ram_gb'] += used_mem_mb / 1024
+        az_used['disk_gb'] += used_disk_mb / 1024
+
+        # --- Calculate Overall Totals ---
+        overall['total_vms'] += vms
+        overall_status['running'] += running
+        overall_status['stopped'] += stopped
+        overall_status['other'] += other
+        provisioned['cpu_cores'] += cores
+        provisioned['memory_gb'] += memory_mb / 1024
+        provisioned['disk_tb'] += disk_mb / (1024 * 1024)
+        used['cpu_mhz'] += used_mhz
+        used['memory_gb'] += used_mem_mb / 1024
+        used['disk_gb'] += used_disk_mb / 1024
+
 class _EC2RequestAuth(requests.auth.AuthBase):
     """
     A private helper class that generates AWS Signature V4-like authentication headers
     for each request.
     """
+    # Partial: AuthBase defines no __slots__, so instances still carry a __dict__.
+    __slots__ = (
+        'access_key', 'secret_key', 'region', 'service', 'algorithm',
+        '_signed_headers_str', '_scope_suffix', '_algo_b', '_signed_b',
+        'secret_key_bytes', '_key_cache',
+    )
+
     def __init__(self, access_key, secret_key, region, service):
         self.access_key = access_key
         self.secret_key = secret_key
         self.region = region
         self.service = service
         self.algorithm = 'AWS4-HMAC-SHA256'
+        self._signed_headers_str = 'host;x-amz-date' # Already sorted, as required for signing.
+        self._scope_suffix = f"/{region}/{service}/aws4_request"
+        # Pre-encoded pieces of the canonical request and string to sign, which are built as bytes.
+        self._algo_b = self.algorithm.encode('ascii')
+        self._signed_b = self._signed_headers_str.encode('ascii')
+        self.secret_key_bytes = ("AWS4" + secret_key).encode('utf-8')
+        self._key_cache = (None, None) # (datestamp, signing_key), the key only changes once a day
 
     def __call__(self, r):
-        t = datetime.datetime.now(datetime.UTC)
-        amzdate = t.strftime('%Y%m%dT%H%M%SZ')
-        datestamp = t.strftime('%Ym%d')
+        gm = time.gmtime()
+        amzdate = '%04d%02d%02dT%02d%02d%02dZ' % (gm.tm_year, gm.tm_mon, gm.tm_mday, gm.tm_hour, gm.tm_min, gm.tm_sec)
+        datestamp = amzdate[:8]
 
         url = urlparse(r.url)
         host = url.netloc
 
-        headers = r.headers.copy()
-        headers['X-Amz-Date'] = amzdate
-        headers['Host'] = host
+        # The prepared request owns its headers, so they are updated in place.
+        r.headers['X-Amz-Date'] = amzdate
+        r.headers['Host'] = host
 
         canonical_uri = url.path if url.path else '/'
-        canonical_querystring = "" # This is kept empty due to API's non-standard signature verification.
-        
-        signed_headers_list = sorted(['host', 'x-amz-date'])
-        signed_headers_str = ';'.join(signed_headers_list)
+        amzdate_b = amzdate.encode('ascii')
+        canonical_headers_b = b''.join([b"host:", host.encode('utf-8'), b"\nx-amz-date:", amzdate_b, b"\n"])
         
-        canonical_headers = ''.join([f"{header}:{headers[header]}\n" for header in signed_headers_list])
-        
-        body = r.body or b''
-        body_hash = hashlib.sha256(body if isinstance(body, bytes) else body.encode('utf-8')).hexdigest()
+        body_hash_b = _hash_payload(r.body).encode('ascii')
 
-        canonical_request = '\n'.join([
-            r.method, canonical_uri, canonical_querystring,
-            canonical_headers, signed_headers_str, body_hash
+        # The canonical query string is kept empty due to API's non-standard signature verification.
+        canonical_request = b'\n'.join([
+            r.method.encode('ascii'), canonical_uri.encode('utf-8'), b'',
+            canonical_headers_b, self._signed_b, body_hash_b
         ])
 
-        credential_scope = f"{datestamp}/{self.region}/{self.service}/aws4_request"
-        string_to_sign = '\n'.join([
-            self.algorithm, amzdate, credential_scope,
-            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+        credential_scope = f"{datestamp}{self._scope_suffix}"
+        credential_scope_b = credential_scope.encode('utf-8')
+        canonical_hash = _SHA256_TEMPLATE.copy()
+        canonical_hash.update(canonical_request)
+        string_to_sign = b'\n'.join([
+            self._algo_b, amzdate_b, credential_scope_b,
+            canonical_hash.hexdigest().encode('ascii')
         ])
 
-        signing_key = _get_signature_key(self.secret_key, datestamp, self.region, self.service)
-        signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        # Read the cache once: other threads may replace it concurrently around midnight.
+        cached_date, signing_key = self._key_cache
+        if cached_date != datestamp:
+            signing_key = _get_signature_key(self.secret_key_bytes, datestamp, self.region, self.service)
+            self._key_cache = (datestamp, signing_key)
+        signature = hmac.digest(signing_key, string_to_sign, 'sha256').hex()
 
         authorization_header = (
             f"{self.algorithm} Credential={self.access_key}/{credential_scope}, "
-            f"SignedHeaders={signed_headers_str}, Signature={signature}"
+            f"SignedHeaders={self._signed_headers_str}, Signature={signature}"
         )
-        headers['Authorization'] = authorization_header
-        
-        r.headers = headers
+        r.headers['Authorization'] = authorization_header
         return r
 
 class SangforSDKClient:
@@ -98,6 +225,18 @@ class SangforSDKClient:
         self.base_url = base_url.rstrip('/')
         self.verbose = verbose
         self.session = requests.Session()
+        # Keep enough warm connections for the concurrent page downloads in get_all_vms.
+        adapter = HTTPAdapter(
+            pool_connections=16, pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Connection': 'keep-alive',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip',
+        })
         self.session.auth = _EC2RequestAuth(
             access_key=self.access_key,
             secret_key=self.secret_key,
@@ -105,6 +244,7 @@ class SangforSDKClient:
             service=self.service
         )
         self._all_vms_cache = None # Cache for name-based searches
+        self._vm_name_index = None # name -> VM lookup built alongside the cache
 
     def send_request(self, method, path, params=None, json_data=None):
         """Sends an authenticated request to the specified API endpoint."""
@@ -113,12 +253,15 @@ class SangforSDKClient:
             if self.verbose:
                 print(f"==> Request: {method} {full_url} (Params: {params})", file=sys.stderr)
             
-            response = self.session.request(
-                method=method, url=full_url, params=params,
-                json=json_data, verify=False
-            )
+            if method == 'GET' and json_data is None:
+                response = self.session.get(full_url, params=params, verify=False)
+            else:
+                response = self.session.request(
+                    method=method, url=full_url, params=params,
+                    json=json_data, verify=False
+                )
             response.raise_for_status()
-            return response.json()
+            return _loads(response.content)
         except requests.exceptions.HTTPError as e:
             if self.verbose:
                 print(f"==> API Error: {e.response.status_code} {e.response.reason}", file=sys.stderr)
@@ -154,27 +297,70 @@ class SangforSDKClient:
             if self.verbose: print("  - Using cached VM list.", file=sys.stderr)
             return self._all_vms_cache
         
-        all_vms = []
-        current_page = 0
         PAGE_SIZE = 100
-        while True:
+        MAX_WORKERS = 8
+
+        def fetch_page(page_num):
+            response = self.get_vms(page_num=page_num, page_size=PAGE_SIZE)
+            if not (response and response.get('data') and isinstance(response['data'].get('data'), list)):
+                return None, None
+            return response['data']['data'], response['data'].get('next_page_num')
+
+        def show_progress(page_num):
             if self.verbose:
-                sys.stderr.write(f"\r  - Downloading VM list: Page {current_page}...")
+                sys.stderr.write(f"\r  - Downloading VM list: Page {page_num}...")
                 sys.stderr.flush()
-            response = self.get_vms(page_num=current_page, page_size=PAGE_SIZE)
-            if not (response and response.get('data') and isinstance(response['data'].get('data'), list)):
-                break
-            vms_on_this_page = response['data']['data']
+
+        all_vms = []
+        show_progress(0)
+        vms_on_this_page, next_page_info = fetch_page(0)
+        if vms_on_this_page:
             all_vms.extend(vms_on_this_page)
-            next_page_info = response['data'].get('next_page_num')
-            if not next_page_info or not vms_on_this_page:
-                break
+
+        # The remaining pages are requested concurrently and merged back in page order.
+        # The total is unknown, so batches start at a single page and only double while
+        # every page comes back full; a short page drops back to one page at a time.
+        if vms_on_this_page and next_page_info:
             current_page = int(next_page_info)
+            batch_size = 1
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                finished = False
+                while not finished:
+                    futures = {
+                        executor.submit(fetch_page, page_num): index
+                        for index, page_num in enumerate(range(current_page, current_page + batch_size))
+                    }
+                    pages = [None] * len(futures)
+                    for future in as_completed(futures):
+                        pages[futures[future]] = future.result()
+
+                    all_full = True
+                    for index, (vms_on_this_page, next_page_info) in enumerate(pages):
+                        show_progress(current_page + index)
+                        if vms_on_this_page is None:
+                            finished = True
+                            break
+                        all_vms.extend(vms_on_this_page)
+                        if not next_page_info or not vms_on_this_page:
+                            finished = True
+                            break
+                        if len(vms_on_this_page) < PAGE_SIZE:
+                            all_full = False
+                    current_page += batch_size
+                    batch_size = min(batch_size * 2, MAX_WORKERS) if all_full else 1
         
         if self.verbose:
             sys.stderr.write("\r" + " " * 50 + "\r")
         
+        # Keep the first VM for duplicate names, matching a linear scan of the list.
+        vm_name_index = {}
+        for vm in all_vms:
+            name = vm.get('name')
+            if name and name not in vm_name_index:
+                vm_name_index[name] = vm
+
         self._all_vms_cache = all_vms
+        self._vm_name_index = vm_name_index
         return all_vms
 
     def get_vm_details(self, vm_id):
@@ -187,7 +373,7 @@ class SangforSDKClient:
         """
         Finds a VM by its ID or exact name and returns its detailed information.
         """
-        is_uuid = len(identifier.split('-')) == 5
+        is_uuid = bool(_UUID_RE.match(identifier))
         
         if is_uuid:
             if self.verbose: print("Input detected as an ID. Querying directly...", file=sys.stderr)
@@ -195,7 +381,11 @@ class SangforSDKClient:
         else:
             if self.verbose: print("Input detected as a name. Scanning full VM list...", file=sys.stderr)
             vm_list = self.get_all_vms()
-            target_vm = next((vm for vm in vm_list if vm.get('name') == identifier), None)
+            if self._vm_name_index is not None and vm_list is self._all_vms_cache:
+                target_vm = self._vm_name_index.get(identifier)
+            else:
+                # The list did not come from the cache (e.g. an overridden get_all_vms); scan it.
+                target_vm = next((vm for vm in vm_list if vm.get('name') == identifier), None)
             if target_vm:
                 vm_id = target_vm.get('id')
                 if self.verbose: print(f"Found '{identifier}'. Fetching details (ID: {vm_id})...", file=sys.stderr)
@@ -253,55 +443,13 @@ class SangforSDKClient:
                         "total_used": {"cpu_mhz": 0.0, "ram_gb": 0.0, "disk_gb": 0.0}
                     }
         
-        for vm in all_vms:
-            az_name = vm.get('az_name')
-            if not az_name or az_name not in report['by_availability_zone']:
-                continue
+        _aggregate_report(report, all_vms)
 
-            status = vm.get('status', 'other')
-            if status not in ['running', 'stopped']:
-                status = 'other'
-
-            # --- Calculate Overall Totals ---
-            report['overall_totals']['total_vms'] += 1
-            report['overall_totals']['vms_by_status'][status] += 1
-            
-            cores = vm.get('cores', 0)
-            memory_mb = vm.get('memory_mb', 0.0)
-            total_disk_mb = sum(disk.get('size_mb', 0.0) for disk in vm.get('disks', []))
-
-            report['overall_totals']['total_provisioned']['cpu_cores'] += cores
-            report['overall_totals']['total_provisioned']['memory_gb'] += memory_mb / 1024
-            report['overall_totals']['total_provisioned']['disk_tb'] += total_disk_mb / (1024 * 1024)
-            
-            # --- Calculate AZ-Specific Totals ---
-            az_report = report['by_availability_zone'][az_name]
-            az_report['total_vms'] += 1
-            az_report['vms_by_status'][status] += 1
-            az_report['total_provisioned']['cpu_cores'] += cores
-            az_report['total_provisioned']['ram_gb'] += memory_mb / 1024
-            az_report['total_provisioned']['disk_tb'] += total_disk_mb / (1024 * 1024)
-
-            # --- Calculate Used Resources ---
-            if vm.get('cpu_status'):
-                used_mhz = vm['cpu_status'].get('used_mhz', 0.0)
-                report['overall_totals']['total_used']['cpu_mhz'] += used_mhz
-                az_report['total_used']['cpu_mhz'] += used_mhz
-
-            if vm.get('memory_status'):
-                used_mem_mb = vm['memory_status'].get('used_mb', 0.0)
-                report['overall_totals']['total_used']['memory_gb'] += used_mem_mb / 1024
-                az_report['total_used']['ram_gb'] += used_mem_mb / 1024
-
-            if vm.get('storage_status'):
-                used_disk_mb = vm['storage_status'].get('used_mb', 0.0)
-                report['overall_totals']['total_used']['disk_gb'] += used_disk_mb / 1024
-                az_report['total_used']['disk_gb'] += used_disk_mb / 1024
-        
         # --- Finalize Report (Rounding) ---
-        for category in [report['overall_totals']] + list(report['by_availability_zone'].values()):
-            for section in ['total_provisioned', 'total_used']:
-                for key, value in category[section].items():
-                    category[section][key] = round(value, 2)
+        for category in chain((report['overall_totals'],), report['by_availability_zone'].values()):
+            for section_name in ('total_provisioned', 'total_used'):
+                section = category[section_name]
+                for key in section:
+                    section[key] = round(section[key], 2)
         
         return report